@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: dpi.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tdpi.proto\x12\x08\x64\x65\x65pscan\"\xbd\x02\n\tFieldInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x12\n\nfield_type\x18\x02 \x01(\t\x12\x10\n\x08min_size\x18\x03 \x01(\x05\x12\x10\n\x08max_size\x18\x04 \x01(\x05\x12\x1c\n\x0f\x62itfields_count\x18\x05 \x01(\x05H\x00\x88\x01\x01\x12\x16\n\tmin_value\x18\x06 \x01(\x01H\x01\x88\x01\x01\x12\x16\n\tmax_value\x18\x07 \x01(\x01H\x02\x88\x01\x01\x12\x1d\n\x10is_dynamic_array\x18\x08 \x01(\x08H\x03\x88\x01\x01\x12 \n\x13size_defining_field\x18\t \x01(\tH\x04\x88\x01\x01\x42\x12\n\x10_bitfields_countB\x0c\n\n_min_valueB\x0c\n\n_max_valueB\x13\n\x11_is_dynamic_arrayB\x16\n\x14_size_defining_field\"9\n\x06IpSpec\x12\n\n\x02ip\x18\x01 \x01(\t\x12#\n\x06\x66ields\x18\x02 \x03(\x0b\x32\x13.deepscan.FieldInfo\":\n\x07\x44piSpec\x12\x10\n\x08protocol\x18\x01 \x01(\t\x12\x1d\n\x03\x64pi\x18\x02 \x03(\x0b\x32\x10.deepscan.IpSpecb\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'dpi_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _FIELDINFO._serialized_start=24
+  _FIELDINFO._serialized_end=341
+  _IPSPEC._serialized_start=343
+  _IPSPEC._serialized_end=400
+  _DPISPEC._serialized_start=402
+  _DPISPEC._serialized_end=460
+# @@protoc_insertion_point(module_scope)
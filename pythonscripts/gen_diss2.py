@@ -7,6 +7,8 @@ and generates:
      - If errors, the Info column only shows "[DPI Error: ...]".
   2. A general static dissector (saved as <protocol>.lua) that decodes fields according 
      to fixed sizes (no DPI tests), showing a summary of fields in the Info column.
+Each generated file is standalone: the shared helpers (popcount, to_binary_str,
+check_dyn, from templates/helpers.lua.j2) are emitted as file-scope locals.
 
 Now, each field in the DPI JSON has an additional property "bitfields_count" (an integer or null).
 When a field’s type is "bitfield", the generated code will:
@@ -15,16 +17,47 @@ When a field’s type is "bitfield", the generated code will:
 
 Additional types supported: int, float, double, char, long, bool, bitfield, and more.
 
-Note on float/double extraction:
-Wireshark's TvbRange object does not have le_double()/le_float() methods.
-Instead, we extract the raw bytes and use string.unpack.
-In this example the big‑endian format is used (">f" for float, ">d" for double).
+The Lua source itself lives in Jinja2 templates under templates/; this script only
+loads the JSON and renders one file per IP plus the static dissector. ProtoField
+types are looked up in PROTOFIELD_MAP by (field_type, min_size).
+
+Note on numeric extraction:
+Fixed-size int/long/bool/bitfield fields are decoded with string.unpack on
+TvbRange:raw(), using a big-endian ">I<size>" format chosen at generation time.
+Integers whose length comes from another field are read with
+TvbRange:uint()/uint64(). Float and double fields use TvbRange:float() on a
+4- or 8-octet range respectively; float() picks the precision from the range
+length, so the width follows the field type (there is no separate double()
+reader).
+When no field is a dynamic array, all the numeric fields are instead decoded
+by a single string.unpack over the whole header (see fixed_layout()).
 """
 
+import functools
+import hashlib
 import json
+import mmap
 import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from jinja2 import Environment, FileSystemLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import dpi_pb2
+except ImportError:
+    dpi_pb2 = None
 
-# Path to the DPI JSON file (change as needed)
+# Path to the DPI JSON file (change as needed); a binary DpiSpec with a .pb
+# extension (see dpi.proto, and --to-pb at the bottom of this file) is also
+# accepted
 JSON_FILENAME = "/mnt/c/Users/aviv/Desktop/newProject/server/dpi_output.json"
 
 # Directory to save the Lua files
@@ -33,516 +66,404 @@ OUTPUT_DIR = "/mnt/c/Users/aviv/Desktop/newProject/data"
 # UDP port to register the dissectors (change if needed)
 UDP_PORT = 10000
 
-# Ensure output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Emit the per-packet debug print of every parsed value. Off by default: it
+# runs print() for each field of every packet, so it is left out of the
+# generated Lua entirely rather than guarded at run time.
+DEBUG = False
+
+# Write buffer for the generated files, large enough that each file goes out
+# in a single write() (per-syscall cost is high on the /mnt/c WSL mount). The
+# files are opened in binary mode and each is encoded to UTF-8 exactly once.
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Rendering costs roughly 35 us per field, while starting a process pool costs
+# tens of milliseconds, so the per-IP dissectors are only rendered in parallel
+# once the schema groups hold this many fields in total
+PARALLEL_MIN_FIELDS = 2000
+
+# ProtoField constructor and base argument for each (field_type, min_size).
+# A size of None is the fallback for any size not listed for that type.
+PROTOFIELD_MAP = {
+    ("bool", None): ("ProtoField.uint8", ", base.DEC"),
+    ("int", 1): ("ProtoField.uint8", ", base.DEC"),
+    ("int", 2): ("ProtoField.uint16", ", base.DEC"),
+    ("int", 4): ("ProtoField.uint32", ", base.DEC"),
+    ("int", 8): ("ProtoField.uint64", ", base.DEC"),
+    ("int", None): ("ProtoField.uint32", ", base.DEC"),
+    ("float", None): ("ProtoField.float", ""),
+    ("double", None): ("ProtoField.double", ""),
+    ("long", 8): ("ProtoField.uint64", ", base.DEC"),
+    ("long", None): ("ProtoField.int32", ", base.DEC"),
+    ("char", None): ("ProtoField.string", ""),
+    ("bitfield", 1): ("ProtoField.uint8", ""),
+    ("bitfield", 2): ("ProtoField.uint16", ""),
+    ("bitfield", 4): ("ProtoField.uint32", ""),
+    ("bitfield", 8): ("ProtoField.uint64", ""),
+    ("bitfield", None): ("ProtoField.uint32", ""),
+}
+DEFAULT_PROTOFIELD = ("ProtoField.string", "")
+
+# Declaration line for a field's ProtoField
+PROTOFIELD_TMPL = 'local f_{name} = {pft}("{pn}.{name}", "{label}"{base})'
+BITFIELD_LABEL_TMPL = "{cap} (Bitfield)"
+
+##########################################################################
+# Helper to build the ProtoField declaration line for a single field
+##########################################################################
+def _emit_protofield(proto_name, field_name, cap, ftype, size):
+    proto_field_type, base = PROTOFIELD_MAP.get((ftype, size)) or PROTOFIELD_MAP.get((ftype, None), DEFAULT_PROTOFIELD)
+    label = BITFIELD_LABEL_TMPL.format(cap=cap) if ftype == "bitfield" else cap
+    return PROTOFIELD_TMPL.format(name=field_name, pft=proto_field_type, pn=proto_name, label=label, base=base)
+
+# Placeholders rendered into a per-IP dissector and filled in for each IP
+IP_PLACEHOLDER = "@IP@"
+PROTO_NAME_PLACEHOLDER = "@PROTO_NAME@"
+
+# Directory holding the Lua templates (templates/dissector.lua.j2, templates/static.lua.j2)
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Compile the templates once at load time; each file is then a single render() + write()
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+)
+env.globals["emit_protofield"] = _emit_protofield
+DISSECTOR_TEMPLATE = env.get_template("dissector.lua.j2")
+STATIC_TEMPLATE = env.get_template("static.lua.j2")
 
-# Load the DPI specification
-with open(JSON_FILENAME, "r") as f:
-    dpi_spec = json.load(f)
+# First line of every generated file: a digest of the generator and of the
+# inputs the file was rendered from, so an unchanged file is not rewritten
+HASH_HEADER = "-- DEEPSCAN-HASH: {}\n"
 
-protocol = dpi_spec.get("protocol", "CustomProtocol")
-dpi_data = dpi_spec.get("dpi", {})
+def _generator_digest():
+    # Any change to this script or a template has to invalidate every output
+    h = hashlib.blake2b(digest_size=16)
+    paths = [os.path.abspath(__file__)]
+    paths += [os.path.join(TEMPLATE_DIR, name) for name in sorted(os.listdir(TEMPLATE_DIR))]
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.digest()
+
+GENERATOR_DIGEST = _generator_digest()
+
+##########################################################################
+# Load the DPI spec (orjson over a read-only mmap when available, or protobuf)
+##########################################################################
+def load_dpi_spec(path):
+    if path.endswith(".pb"):
+        with open(path, "rb") as f:
+            return dpi_spec_from_pb(f.read())
+    if orjson is None:
+        with open(path, "r") as f:
+            return json.load(f)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # The view has to be released before the mmap can close
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+def dpi_spec_from_pb(data):
+    # Decode a serialized DpiSpec into the same dict layout as the JSON file
+    if dpi_pb2 is None:
+        raise RuntimeError("Reading a .pb DPI spec requires the protobuf package")
+    spec = dpi_pb2.DpiSpec.FromString(data)
+    dpi = {}
+    for ip_spec in spec.dpi:
+        fields = {}
+        for field in ip_spec.fields:
+            fields[field.name] = {
+                "field_type": field.field_type,
+                "min_size": field.min_size,
+                "max_size": field.max_size,
+                "bitfields_count": field.bitfields_count if field.HasField("bitfields_count") else None,
+                "min_value": field.min_value if field.HasField("min_value") else None,
+                "max_value": field.max_value if field.HasField("max_value") else None,
+                "is_dynamic_array": field.is_dynamic_array,
+                "size_defining_field": field.size_defining_field if field.HasField("size_defining_field") else None,
+            }
+        dpi[ip_spec.ip] = fields
+    return {"protocol": spec.protocol, "dpi": dpi}
+
+def dpi_spec_to_pb(dpi_spec):
+    # Encode a JSON-style DPI spec as a serialized DpiSpec
+    if dpi_pb2 is None:
+        raise RuntimeError("Writing a .pb DPI spec requires the protobuf package")
+    spec = dpi_pb2.DpiSpec(protocol=dpi_spec.get("protocol", "CustomProtocol"))
+    for ip, fields in dpi_spec.get("dpi", {}).items():
+        ip_spec = spec.dpi.add(ip=ip)
+        for field_name, info in fields.items():
+            get = info.get
+            min_size = int(info["min_size"])
+            field = ip_spec.fields.add(
+                name=field_name,
+                field_type=info["field_type"],
+                min_size=min_size,
+                max_size=int(get("max_size") or min_size),
+                is_dynamic_array=bool(get("is_dynamic_array", False)),
+            )
+            for key in ("bitfields_count", "min_value", "max_value", "size_defining_field"):
+                value = get(key)
+                if value is not None:
+                    setattr(field, key, value)
+    return spec.SerializeToString()
 
 ##########################################################################
 # Helper function to generate the list of all fields (including bitfields)
 ##########################################################################
-def generate_field_list(fields):
-    all_fields = []
-    for field_name, info in fields.items():
-        all_fields.append(f"f_{field_name}")
+def field_list_key(fields):
+    # Only the name, type and bitfield count of each field affect the list
+    return tuple((field_name, info.get("field_type"), info.get("bitfields_count")) for field_name, info in fields.items())
+
+@functools.lru_cache(maxsize=None)
+def _value_names(key):
+    # Names of every parsed value, in dissection order
+    names = []
+    add = names.append
+    for field_name, field_type, bitfields_count in key:
+        add(field_name)
         # Only add decomposed bitfield entries if the field type is not "bitfield"
-        if info.get("field_type") != "bitfield":
-            bitfields_count = info.get("bitfields_count")
+        if field_type != "bitfield":
             if bitfields_count is not None and bitfields_count:
                 for i in range(bitfields_count):
-                    all_fields.append(f"f_{field_name}_bf{i}")
-    return all_fields
+                    add(f"{field_name}_bf{i}")
+    return tuple(names)
+
+@functools.lru_cache(maxsize=None)
+def _field_list(key):
+    return tuple(f"f_{name}" for name in _value_names(key))
+
+def generate_field_list(fields):
+    # IPs that share a schema share one cached tuple
+    return _field_list(field_list_key(fields))
+
+def generate_value_names(fields):
+    return _value_names(field_list_key(fields))
 
 ##########################################################################
-# 1. Generate per-IP Lua dissectors (with DPI tests)
+# Content-hash caching: skip files whose inputs have not changed
 ##########################################################################
-for ip, fields in dpi_data.items():
-    ip_clean = ip.replace('.', '_')
-    proto_name = f"{protocol}_{ip_clean}"
-    filename = f"{protocol}_for_{ip_clean}.lua"
-    filepath = os.path.join(OUTPUT_DIR, filename)
-    
-    with open(filepath, "w") as outfile:
-        # Header
-        outfile.write(f"-- Wireshark Lua dissector for {protocol} on IP {ip}\n")
-        outfile.write("-- Generated automatically from DPI JSON.\n\n")
-        
-        # Proto definition
-        outfile.write(f"local {proto_name} = Proto(\"{proto_name}\", \"{protocol} for IP {ip}\")\n\n")
-        
-        # Declare ProtoFields for each field
-        for field_name, info in fields.items():
-            ftype = info["field_type"]
-            if ftype == "bool":
-                proto_field_type = "ProtoField.uint8"
-                base = ", base.DEC"
-                outfile.write(f"local f_{field_name} = {proto_field_type}(\"{proto_name}.{field_name}\", \"{field_name.capitalize()}\"){base}\n")
-            elif ftype == "int":
-                size = info["min_size"]
-                if size == 1:
-                    proto_field_type = "ProtoField.uint8"
-                elif size == 2:
-                    proto_field_type = "ProtoField.uint16"
-                elif size == 4:
-                    proto_field_type = "ProtoField.uint32"
-                elif size == 8:
-                    proto_field_type = "ProtoField.uint64"
-                else:
-                    proto_field_type = "ProtoField.uint32"
-                base = ", base.DEC"
-                outfile.write(f"local f_{field_name} = {proto_field_type}(\"{proto_name}.{field_name}\", \"{field_name.capitalize()}\"){base}\n")
-            elif ftype == "float":
-                outfile.write(f"local f_{field_name} = ProtoField.float(\"{proto_name}.{field_name}\", \"{field_name.capitalize()}\")\n")
-            elif ftype == "double":
-                outfile.write(f"local f_{field_name} = ProtoField.double(\"{proto_name}.{field_name}\", \"{field_name.capitalize()}\")\n")
-            elif ftype == "long":
-                if info["min_size"] == 8:
-                    outfile.write(f"local f_{field_name} = ProtoField.uint64(\"{proto_name}.{field_name}\", \"{field_name.capitalize()}\", base.DEC)\n")
-                else:
-                    outfile.write(f"local f_{field_name} = ProtoField.int32(\"{proto_name}.{field_name}\", \"{field_name.capitalize()}\", base.DEC)\n")
-            elif ftype == "char":
-                proto_field_type = "ProtoField.string"
-                base = ""
-                outfile.write(f"local f_{field_name} = {proto_field_type}(\"{proto_name}.{field_name}\", \"{field_name.capitalize()}\"){base}\n")
-            elif ftype == "bitfield":
-                size = info["min_size"]
-                if size == 1:
-                    proto_field_type = "ProtoField.uint8"
-                elif size == 2:
-                    proto_field_type = "ProtoField.uint16"
-                elif size == 4:
-                    proto_field_type = "ProtoField.uint32"
-                elif size == 8:
-                    proto_field_type = "ProtoField.uint64"
-                else:
-                    proto_field_type = "ProtoField.uint32"
-                base = ""
-                outfile.write(f"local f_{field_name} = {proto_field_type}(\"{proto_name}.{field_name}\", \"{field_name.capitalize()} (Bitfield)\"){base}\n")
-            else:
-                outfile.write(f"local f_{field_name} = ProtoField.string(\"{proto_name}.{field_name}\", \"{field_name.capitalize()}\")\n")
-            
-            # For non-bitfield types with bitfields_count defined, declare additional ProtoFields.
-            if info.get("field_type") != "bitfield":
-                bitfields_count = info.get("bitfields_count")
-                if bitfields_count is not None and bitfields_count:
-                    for i in range(bitfields_count):
-                        lua_bf_field = f"f_{field_name}_bf{i}"
-                        bf_label = f"{field_name.capitalize()} Bitfield {i+1}"
-                        outfile.write(f"local {lua_bf_field} = ProtoField.uint8(\"{proto_name}.{field_name}_bf{i}\", \"{bf_label}\", base.DEC)\n")
-                    bf_fields_list = ", ".join([f"f_{field_name}_bf{i}" for i in range(bitfields_count)])
-                    outfile.write(f"local bf_fields_{field_name} = {{ {bf_fields_list} }}\n")
-        
-        outfile.write("\n")
-        # Register all fields (including bitfields)
-        all_fields = generate_field_list(fields)
-        outfile.write(f"{proto_name}.fields = {{ {', '.join(all_fields)} }}\n\n")
-        
-        # Begin dissector function and add helper functions for bitfield processing
-        outfile.write(f"function {proto_name}.dissector(buffer, pinfo, tree)\n")
-        outfile.write("    if buffer:len() == 0 then return end\n")
-        outfile.write(f"    pinfo.cols.protocol = \"{protocol}\"\n")
-        outfile.write(f"    local subtree = tree:add({proto_name}, buffer(), \"{protocol} for IP {ip}\")\n")
-        outfile.write("    local offset = 0\n")
-        outfile.write("    local dpi_error = false\n")
-        outfile.write("    local error_messages = {}\n")
-        outfile.write("    local parsed_values = {}\n\n")
-        
-        # Helper functions for bitfield type
-        outfile.write("    -- Helper function to count the number of bits set in a value\n")
-        outfile.write("    local function popcount(x)\n")
-        outfile.write("        local count = 0\n")
-        outfile.write("        while x > 0 do\n")
-        outfile.write("            count = count + (x % 2)\n")
-        outfile.write("            x = math.floor(x / 2)\n")
-        outfile.write("        end\n")
-        outfile.write("        return count\n")
-        outfile.write("    end\n\n")
-        
-        outfile.write("    -- Helper function to convert a number to a binary string of a given bit length\n")
-        outfile.write("    local function to_binary_str(num, bits)\n")
-        outfile.write("        local s = \"\"\n")
-        outfile.write("        for i = bits - 1, 0, -1 do\n")
-        outfile.write("            local bit_val = bit.rshift(num, i)\n")
-        outfile.write("            s = s .. (bit.band(bit_val, 1) == 1 and \"1\" or \"0\")\n")
-        outfile.write("        end\n")
-        outfile.write("        return s\n")
-        outfile.write("    end\n\n")
-        
-        # Parse each field
-        for field_name, info in fields.items():
-            ftype = info["field_type"]
-            outfile.write(f"    -- Field: {field_name}\n")
-            if ftype == "bitfield":
-                outfile.write(f"    if buffer:len() < offset + {info['min_size']} then\n")
-                outfile.write(f"        subtree:add_expert_info(PI_MALFORMED, PI_ERROR, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        dpi_error = true\n")
-                outfile.write(f"        table.insert(error_messages, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        return\n")
-                outfile.write("    end\n")
-                if info["min_size"] == 8:
-                    outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):uint64()\n")
-                else:
-                    outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):uint()\n")
-                outfile.write(f"    local {field_name}_item = subtree:add(f_{field_name}, buffer(offset, {info['min_size']}))\n")
-                outfile.write(f"    local num_bits = {info['min_size']} * 8\n")
-                outfile.write(f"    local actual_bit_count = popcount({field_name})\n")
-                outfile.write(f"    if actual_bit_count ~= {info['bitfields_count']} then\n")
-                outfile.write(f"        {field_name}_item:add_expert_info(PI_MALFORMED, PI_ERROR, \"Bitfield {field_name} expected {info['bitfields_count']} bits set, got \" .. actual_bit_count)\n")
-                outfile.write("        dpi_error = true\n")
-                outfile.write(f"        table.insert(error_messages, \"Bitfield {field_name} expected {info['bitfields_count']} bits set, got \" .. actual_bit_count)\n")
-                outfile.write("    end\n")
-                outfile.write("    local binary_str = to_binary_str(" + field_name + ", num_bits)\n")
-                outfile.write(f"    {field_name}_item:append_text(\" (\" .. binary_str .. \")\")\n")
-                outfile.write(f"    parsed_values['{field_name}'] = binary_str\n")
-                outfile.write(f"    offset = offset + {info['min_size']}\n\n")
-            elif not info.get("is_dynamic_array", False):
-                outfile.write(f"    if buffer:len() < offset + {info['min_size']} then\n")
-                outfile.write(f"        subtree:add_expert_info(PI_MALFORMED, PI_ERROR, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        return\n")
-                outfile.write("    end\n")
-                if ftype in ["int", "bool", "long"]:
-                    if info["min_size"] == 8:
-                        outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):uint64()\n")
-                    else:
-                        outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):uint()\n")
-                elif ftype == "float":
-                    outfile.write(f"    local {field_name}_bytes = buffer(offset, {info['min_size']}):bytes():raw()\n")
-                    outfile.write(f"    local {field_name} = string.unpack(\">f\", {field_name}_bytes)\n")
-                elif ftype == "double":
-                    outfile.write(f"    local {field_name}_bytes = buffer(offset, {info['min_size']}):bytes():raw()\n")
-                    outfile.write(f"    local {field_name} = string.unpack(\">d\", {field_name}_bytes)\n")
-                else:
-                    outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):string()\n")
-                outfile.write(f"    local {field_name}_item = subtree:add(f_{field_name}, buffer(offset, {info['min_size']}))\n")
-                outfile.write(f"    parsed_values['{field_name}'] = {field_name}\n")
-                
-                if ftype in ["int", "bool", "long", "float", "double"] and info.get("min_value") is not None and info.get("max_value") is not None:
-                    outfile.write("    do\n")
-                    outfile.write(f"        local min_val = {info['min_value']}\n")
-                    outfile.write(f"        local max_val = {info['max_value']}\n")
-                    outfile.write(f"        if {field_name} < min_val or {field_name} > max_val then\n")
-                    outfile.write(f"            {field_name}_item:add_expert_info(PI_MALFORMED, PI_ERROR, \"Value out of range for {field_name}\")\n")
-                    outfile.write("            dpi_error = true\n")
-                    outfile.write(f"            table.insert(error_messages, \"{field_name} out of range\")\n")
-                    outfile.write("        end\n")
-                    outfile.write("    end\n")
-                
-                outfile.write(f"    offset = offset + {info['min_size']}\n\n")
-                
-                bitfields_count = info.get("bitfields_count")
-                if bitfields_count is not None and bitfields_count:
-                    outfile.write("    do\n")
-                    outfile.write(f"        local bits_per_field = ({info['min_size']} * 8) / {bitfields_count}\n")
-                    outfile.write(f"        for i = 0, {bitfields_count} - 1 do\n")
-                    outfile.write("            local shift = (({0} - 1 - i) * bits_per_field)\n".format(bitfields_count))
-                    outfile.write("            local mask = (1 << bits_per_field) - 1\n")
-                    outfile.write(f"            local bf_value = bit.band(bit.rshift({field_name}, shift), mask)\n")
-                    outfile.write(f"            subtree:add(bf_fields_{field_name}[i+1], bf_value)\n")
-                    outfile.write(f"            parsed_values['{field_name}_bf' .. i] = bf_value\n")
-                    outfile.write("        end\n")
-                    outfile.write("    end\n\n")
-            else:
-                size_field = info["size_defining_field"]
-                outfile.write(f"    local dynamic_length = {size_field}\n")
-                outfile.write(f"    if dynamic_length < {info['min_size']} or dynamic_length > {info['max_size']} then\n")
-                outfile.write(f"        subtree:add_expert_info(PI_MALFORMED, PI_ERROR, \"{field_name} length out of range\")\n")
-                outfile.write("        dpi_error = true\n")
-                outfile.write(f"        table.insert(error_messages, \"{field_name} length out of range\")\n")
-                outfile.write("    end\n")
-                outfile.write(f"    if buffer:len() < offset + dynamic_length then\n")
-                outfile.write(f"        subtree:add_expert_info(PI_MALFORMED, PI_ERROR, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        dpi_error = true\n")
-                outfile.write(f"        table.insert(error_messages, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        return\n")
-                outfile.write("    end\n")
-                if ftype in ["int", "bool", "long"]:
-                    if info["min_size"] == 8:
-                        outfile.write(f"    local {field_name} = buffer(offset, dynamic_length):uint64()\n")
-                    else:
-                        outfile.write(f"    local {field_name} = buffer(offset, dynamic_length):uint()\n")
-                elif ftype == "float":
-                    outfile.write(f"    local {field_name}_bytes = buffer(offset, dynamic_length):bytes():raw()\n")
-                    outfile.write(f"    local {field_name} = string.unpack(\">f\", {field_name}_bytes)\n")
-                elif ftype == "double":
-                    outfile.write(f"    local {field_name}_bytes = buffer(offset, dynamic_length):bytes():raw()\n")
-                    outfile.write(f"    local {field_name} = string.unpack(\">d\", {field_name}_bytes)\n")
-                else:
-                    outfile.write(f"    local {field_name} = buffer(offset, dynamic_length):string()\n")
-                outfile.write(f"    local {field_name}_item = subtree:add(f_{field_name}, buffer(offset, dynamic_length))\n")
-                outfile.write(f"    parsed_values['{field_name}'] = {field_name}\n")
-                outfile.write("    offset = offset + dynamic_length\n\n")
-                
-                bitfields_count = info.get("bitfields_count")
-                if bitfields_count is not None and bitfields_count:
-                    outfile.write("    do\n")
-                    outfile.write(f"        local bits_per_field = (dynamic_length * 8) / {bitfields_count}\n")
-                    outfile.write(f"        for i = 0, {bitfields_count} - 1 do\n")
-                    outfile.write("            local shift = (({0} - 1 - i) * bits_per_field)\n".format(bitfields_count))
-                    outfile.write("            local mask = (1 << bits_per_field) - 1\n")
-                    outfile.write(f"            local bf_value = bit.band(bit.rshift({field_name}, shift), mask)\n")
-                    outfile.write(f"            subtree:add(bf_fields_{field_name}[i+1], bf_value)\n")
-                    outfile.write(f"            parsed_values['{field_name}_bf' .. i] = bf_value\n")
-                    outfile.write("        end\n")
-                    outfile.write("    end\n\n")
-        
-        # --- Added printing of packet details for each field ---
-        outfile.write("    -- Print packet details for each field (for debugging purposes)\n")
-        outfile.write("    print(\"Packet details for IP \" .. tostring(\"" + ip + "\") .. \":\")\n")
-        outfile.write("    for k, v in pairs(parsed_values) do\n")
-        outfile.write("        print(\"  \" .. k .. \" = \" .. tostring(v))\n")
-        outfile.write("    end\n\n")
-        # --- End printing packet details ---
-        
-        outfile.write("    if dpi_error then\n")
-        outfile.write("        local msg = table.concat(error_messages, \"; \")\n")
-        outfile.write("        pinfo.cols.info = \"[DPI Error: \" .. msg .. \"]\"\n")
-        outfile.write("        subtree:add_expert_info(PI_PROTOCOL, PI_ERROR, \"DPI Error in this packet\")\n")
-        outfile.write("    else\n")
-        outfile.write("        local parts = {}\n")
-        outfile.write("        for k, v in pairs(parsed_values) do\n")
-        outfile.write("            table.insert(parts, k .. \"=\" .. tostring(v))\n")
-        outfile.write("        end\n")
-        outfile.write("        table.sort(parts)\n")
-        outfile.write("        pinfo.cols.info = table.concat(parts, \", \")\n")
-        outfile.write("    end\n")
-        
-        outfile.write("end\n\n")
-        
-        outfile.write("-- Register this dissector for UDP port\n")
-        outfile.write("local udp_port = DissectorTable.get(\"udp.port\")\n")
-        outfile.write(f"udp_port:add({UDP_PORT}, {proto_name})\n")
-    
-    print(f"Generated per-IP dissector: {filepath}")
+def content_hash(*inputs):
+    # inputs must be JSON-serializable and fully determine the file's contents
+    h = hashlib.blake2b(GENERATOR_DIGEST, digest_size=16)
+    h.update(json.dumps(inputs).encode("utf-8"))
+    return h.hexdigest()
+
+def is_up_to_date(filepath, digest):
+    try:
+        with open(filepath, "rb") as f:
+            return f.readline() == HASH_HEADER.format(digest).encode("ascii")
+    except FileNotFoundError:
+        return False
+
+def write_output(filepath, digest, body):
+    with open(filepath, "wb", buffering=WRITE_BUFFER_SIZE) as outfile:
+        outfile.write((HASH_HEADER.format(digest) + body).encode("utf-8"))
+
+def bounds_guards(fields):
+    # Fixed-size fields up to the next dynamic array have a total length known
+    # here, so a single bounds check at the start of each such run covers all of
+    # them. Maps the first field of a run to (label, run length in bytes).
+    # Bitfields are always parsed at min_size (see field_parse), so they stay
+    # in the run even when flagged as dynamic.
+    runs = [[]]
+    for field_name, info in fields.items():
+        if info["field_type"] == "bitfield" or not info.get("is_dynamic_array", False):
+            runs[-1].append((field_name, info["min_size"]))
+        else:
+            runs.append([])
+    guards = {}
+    for run in runs:
+        if run:
+            label = run[0][0] if len(run) == 1 else f"{run[0][0]}..{run[-1][0]}"
+            guards[run[0][0]] = (label, int(sum(size for _, size in run)))
+    return guards
+
+# string.unpack format for each numeric field type in a fixed layout
+INT_FIELD_TYPES = ("int", "bool", "long", "bitfield")
+FLOAT_UNPACK_FORMATS = {("float", 4): "f", ("double", 8): "d"}
+
+def fixed_layout(fields):
+    # When no field is a dynamic array, every offset is known here, so all the
+    # numeric fields can be decoded by one string.unpack over the whole header
+    # instead of one tvb read each. Strings and 8-byte int/bool/long fields
+    # (string.unpack would return those signed; they are read with uint64())
+    # keep their own reads, and their bytes are skipped with a "_" target.
+    # Returns None when the layout is not fixed or has fewer than two numbers
+    # to decode.
+    fmt = [">"]
+    names = []
+    decoded = set()
+    size = 0
+    for field_name, info in fields.items():
+        if info.get("is_dynamic_array", False):
+            return None
+        ftype = info["field_type"]
+        n = int(info["min_size"])
+        if ftype in INT_FIELD_TYPES and not (ftype != "bitfield" and n == 8):
+            if not 1 <= n <= 8:
+                return None
+            fmt.append(f"I{n}")
+        elif ftype in ("float", "double"):
+            code = FLOAT_UNPACK_FORMATS.get((ftype, n))
+            if code is None:
+                return None
+            fmt.append(code)
+        else:
+            fmt.append(f"c{n}")
+            names.append("_")
+            size += n
+            continue
+        names.append(field_name)
+        decoded.add(field_name)
+        size += n
+    if len(decoded) < 2:
+        return None
+    return {"format": "".join(fmt), "names": names, "decoded": decoded, "size": size}
+
+def intern_field_types(fields):
+    # Every template branch compares field_type against a handful of literals;
+    # with the value interned, str == (and the PROTOFIELD_MAP lookups) hit the
+    # identity fast path instead of comparing characters. Strings are not
+    # interned again when unpickled, so workers call this on their own copy.
+    for info in fields.values():
+        info["field_type"] = sys.intern(info["field_type"])
+    return fields
+
+def to_format_template(body):
+    # Escape Lua's own braces so that only {ip} and {proto_name} remain as fields
+    body = body.replace("{", "{{").replace("}", "}}")
+    return body.replace(IP_PLACEHOLDER, "{ip}").replace(PROTO_NAME_PLACEHOLDER, "{proto_name}")
+
+# Field properties the templates read; anything else in the spec (ML scores,
+# feature vectors, ...) does not reach the Lua and is left out of schema_key
+SCHEMA_PROPERTIES = (
+    "field_type", "min_size", "max_size", "bitfields_count", "min_value",
+    "max_value", "is_dynamic_array", "size_defining_field",
+)
+
+def schema_key(fields):
+    # Everything that ends up in the generated Lua apart from the IP itself
+    return tuple(
+        (field_name, tuple((prop, info[prop]) for prop in SCHEMA_PROPERTIES if prop in info))
+        for field_name, info in fields.items()
+    )
+
+@functools.lru_cache(maxsize=64)
+def dissector_template(key, protocol, udp_port, debug):
+    # IPs with an identical schema get the same dissector apart from the IP and
+    # proto name, so each schema is rendered once into a str.format template.
+    # Cached on the schema so repeated calls in one process reuse the render.
+    fields = intern_field_types({field_name: dict(items) for field_name, items in key})
+    ctx = {
+        "protocol": protocol,
+        "ip": IP_PLACEHOLDER,
+        "proto_name": PROTO_NAME_PLACEHOLDER,
+        "fields": fields,
+        "field_list": generate_field_list(fields),
+        "value_names": generate_value_names(fields),
+        "bounds_guards": bounds_guards(fields),
+        "layout": fixed_layout(fields),
+        "UDP_PORT": udp_port,
+        "debug": debug,
+    }
+    return to_format_template(DISSECTOR_TEMPLATE.render(ctx))
 
 ##########################################################################
-# 2. Generate a static general dissector for ALL IPs (no DPI tests)
+# Per-IP generation for one schema (module level so worker processes can run it)
 ##########################################################################
-if dpi_data:
-    first_ip = next(iter(dpi_data))
-    fields = dpi_data[first_ip]
-    static_filename = f"{protocol}.lua"
-    static_filepath = os.path.join(OUTPUT_DIR, static_filename)
-    
-    with open(static_filepath, "w") as outfile:
-        outfile.write(f"-- Wireshark Lua static dissector for {protocol}\n")
-        outfile.write("-- Decodes fields by fixed sizes (no DPI tests), showing field summary in Info.\n\n")
-        
-        outfile.write(f"local {protocol} = Proto(\"{protocol}\", \"{protocol}\")\n\n")
-        
-        # Declare ProtoFields for the static dissector
-        for field_name, info in fields.items():
-            ftype = info["field_type"]
-            if ftype == "bool":
-                proto_field_type = "ProtoField.uint8"
-                base = ", base.DEC"
-                outfile.write(f"local f_{field_name} = {proto_field_type}(\"{protocol}.{field_name}\", \"{field_name.capitalize()}\"){base}\n")
-            elif ftype == "int":
-                size = info["min_size"]
-                if size == 1:
-                    proto_field_type = "ProtoField.uint8"
-                elif size == 2:
-                    proto_field_type = "ProtoField.uint16"
-                elif size == 4:
-                    proto_field_type = "ProtoField.uint32"
-                elif size == 8:
-                    proto_field_type = "ProtoField.uint64"
-                else:
-                    proto_field_type = "ProtoField.uint32"
-                base = ", base.DEC"
-                outfile.write(f"local f_{field_name} = {proto_field_type}(\"{protocol}.{field_name}\", \"{field_name.capitalize()}\"){base}\n")
-            elif ftype == "float":
-                outfile.write(f"local f_{field_name} = ProtoField.float(\"{protocol}.{field_name}\", \"{field_name.capitalize()}\")\n")
-            elif ftype == "double":
-                outfile.write(f"local f_{field_name} = ProtoField.double(\"{protocol}.{field_name}\", \"{field_name.capitalize()}\")\n")
-            elif ftype == "long":
-                if info["min_size"] == 8:
-                    outfile.write(f"local f_{field_name} = ProtoField.uint64(\"{protocol}.{field_name}\", \"{field_name.capitalize()}\", base.DEC)\n")
-                else:
-                    outfile.write(f"local f_{field_name} = ProtoField.int32(\"{protocol}.{field_name}\", \"{field_name.capitalize()}\", base.DEC)\n")
-            elif ftype == "char":
-                proto_field_type = "ProtoField.string"
-                base = ""
-                outfile.write(f"local f_{field_name} = {proto_field_type}(\"{protocol}.{field_name}\", \"{field_name.capitalize()}\"){base}\n")
-            elif ftype == "bitfield":
-                size = info["min_size"]
-                if size == 1:
-                    proto_field_type = "ProtoField.uint8"
-                elif size == 2:
-                    proto_field_type = "ProtoField.uint16"
-                elif size == 4:
-                    proto_field_type = "ProtoField.uint32"
-                elif size == 8:
-                    proto_field_type = "ProtoField.uint64"
-                else:
-                    proto_field_type = "ProtoField.uint32"
-                base = ""
-                outfile.write(f"local f_{field_name} = {proto_field_type}(\"{protocol}.{field_name}\", \"{field_name.capitalize()} (Bitfield)\"){base}\n")
-            else:
-                outfile.write(f"local f_{field_name} = ProtoField.string(\"{protocol}.{field_name}\", \"{field_name.capitalize()}\")\n")
-            
-            if ftype != "bitfield":
-                bitfields_count = info.get("bitfields_count")
-                if bitfields_count is not None and bitfields_count:
-                    for i in range(bitfields_count):
-                        lua_bf_field = f"f_{field_name}_bf{i}"
-                        bf_label = f"{field_name.capitalize()} Bitfield {i+1}"
-                        outfile.write(f"local {lua_bf_field} = ProtoField.uint8(\"{protocol}.{field_name}_bf{i}\", \"{bf_label}\", base.DEC)\n")
-                    bf_fields_list = ", ".join([f"f_{field_name}_bf{i}" for i in range(bitfields_count)])
-                    outfile.write(f"local bf_fields_{field_name} = {{ {bf_fields_list} }}\n")
-        
-        outfile.write("\n")
-        all_fields = generate_field_list(fields)
-        outfile.write(f"{protocol}.fields = {{ {', '.join(all_fields)} }}\n\n")
-        
-        outfile.write(f"function {protocol}.dissector(buffer, pinfo, tree)\n")
-        outfile.write("    if buffer:len() == 0 then return end\n")
-        outfile.write(f"    pinfo.cols.protocol = \"{protocol}\"\n")
-        outfile.write(f"    local subtree = tree:add({protocol}, buffer(), \"{protocol}\")\n")
-        outfile.write("    local offset = 0\n")
-        outfile.write("    local field_values = {}\n\n")
-        
-        outfile.write("    -- Add helper functions for bitfield processing\n")
-        outfile.write("    local function popcount(x)\n")
-        outfile.write("        local count = 0\n")
-        outfile.write("        while x > 0 do\n")
-        outfile.write("            count = count + (x % 2)\n")
-        outfile.write("            x = math.floor(x / 2)\n")
-        outfile.write("        end\n")
-        outfile.write("        return count\n")
-        outfile.write("    end\n\n")
-        
-        outfile.write("    local function to_binary_str(num, bits)\n")
-        outfile.write("        local s = \"\"\n")
-        outfile.write("        for i = bits - 1, 0, -1 do\n")
-        outfile.write("            local bit_val = bit.rshift(num, i)\n")
-        outfile.write("            s = s .. (bit.band(bit_val, 1) == 1 and \"1\" or \"0\")\n")
-        outfile.write("        end\n")
-        outfile.write("        return s\n")
-        outfile.write("    end\n\n")
-        
-        for field_name, info in fields.items():
-            ftype = info["field_type"]
-            outfile.write(f"    -- Field: {field_name}\n")
-            if ftype == "bitfield":
-                outfile.write(f"    if buffer:len() < offset + {info['min_size']} then\n")
-                outfile.write(f"        subtree:add_expert_info(PI_MALFORMED, PI_ERROR, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        return\n")
-                outfile.write("    end\n")
-                if info["min_size"] == 8:
-                    outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):uint64()\n")
-                else:
-                    outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):uint()\n")
-                outfile.write(f"    local {field_name}_item = subtree:add(f_{field_name}, buffer(offset, {info['min_size']}))\n")
-                outfile.write(f"    local num_bits = {info['min_size']} * 8\n")
-                outfile.write(f"    local actual_bit_count = popcount({field_name})\n")
-                outfile.write(f"    if actual_bit_count ~= {info['bitfields_count']} then\n")
-                outfile.write(f"        {field_name}_item:add_expert_info(PI_MALFORMED, PI_ERROR, \"Bitfield {field_name} expected {info['bitfields_count']} bits set, got \" .. actual_bit_count)\n")
-                outfile.write("    end\n")
-                outfile.write("    local binary_str = to_binary_str(" + field_name + ", num_bits)\n")
-                outfile.write(f"    {field_name}_item:append_text(\" (\" .. binary_str .. \")\")\n")
-                outfile.write(f"    field_values['{field_name}'] = binary_str\n")
-                outfile.write(f"    offset = offset + {info['min_size']}\n\n")
-            elif not info.get("is_dynamic_array", False):
-                outfile.write(f"    if buffer:len() < offset + {info['min_size']} then\n")
-                outfile.write(f"        subtree:add_expert_info(PI_MALFORMED, PI_ERROR, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        return\n")
-                outfile.write("    end\n")
-                if ftype in ["int", "bool", "long"]:
-                    if info["min_size"] == 8:
-                        outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):uint64()\n")
-                    else:
-                        outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):uint()\n")
-                elif ftype == "float":
-                    outfile.write(f"    local {field_name}_bytes = buffer(offset, {info['min_size']}):bytes():raw()\n")
-                    outfile.write(f"    local {field_name} = string.unpack(\">f\", {field_name}_bytes)\n")
-                elif ftype == "double":
-                    outfile.write(f"    local {field_name}_bytes = buffer(offset, {info['min_size']}):bytes():raw()\n")
-                    outfile.write(f"    local {field_name} = string.unpack(\">d\", {field_name}_bytes)\n")
-                else:
-                    outfile.write(f"    local {field_name} = buffer(offset, {info['min_size']}):string()\n")
-                outfile.write(f"    subtree:add(f_{field_name}, buffer(offset, {info['min_size']}))\n")
-                outfile.write(f"    field_values['{field_name}'] = {field_name}\n")
-                outfile.write(f"    offset = offset + {info['min_size']}\n\n")
-                
-                bitfields_count = info.get("bitfields_count")
-                if bitfields_count is not None and bitfields_count:
-                    outfile.write("    do\n")
-                    outfile.write(f"        local bits_per_field = ({info['min_size']} * 8) / {bitfields_count}\n")
-                    outfile.write(f"        for i = 0, {bitfields_count} - 1 do\n")
-                    outfile.write("            local shift = (({0} - 1 - i) * bits_per_field)\n".format(bitfields_count))
-                    outfile.write("            local mask = (1 << bits_per_field) - 1\n")
-                    outfile.write(f"            local bf_value = bit.band(bit.rshift({field_name}, shift), mask)\n")
-                    outfile.write(f"            subtree:add(bf_fields_{field_name}[i+1], bf_value)\n")
-                    outfile.write(f"            field_values['{field_name}_bf' .. i] = bf_value\n")
-                    outfile.write("        end\n")
-                    outfile.write("    end\n\n")
-            else:
-                size_field = info["size_defining_field"]
-                outfile.write(f"    local dynamic_length = {size_field}\n")
-                outfile.write(f"    if dynamic_length < {info['min_size']} or dynamic_length > {info['max_size']} then\n")
-                outfile.write(f"        subtree:add_expert_info(PI_MALFORMED, PI_ERROR, \"{field_name} length out of range\")\n")
-                outfile.write("        dpi_error = true\n")
-                outfile.write(f"        table.insert(error_messages, \"{field_name} length out of range\")\n")
-                outfile.write("    end\n")
-                outfile.write(f"    if buffer:len() < offset + dynamic_length then\n")
-                outfile.write(f"        subtree:add_expert_info(PI_MALFORMED, PI_ERROR, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        dpi_error = true\n")
-                outfile.write(f"        table.insert(error_messages, \"Not enough bytes for {field_name}\")\n")
-                outfile.write("        return\n")
-                outfile.write("    end\n")
-                if ftype in ["int", "bool", "long"]:
-                    if info["min_size"] == 8:
-                        outfile.write(f"    local {field_name} = buffer(offset, dynamic_length):uint64()\n")
-                    else:
-                        outfile.write(f"    local {field_name} = buffer(offset, dynamic_length):uint()\n")
-                elif ftype == "float":
-                    outfile.write(f"    local {field_name}_bytes = buffer(offset, dynamic_length):bytes():raw()\n")
-                    outfile.write(f"    local {field_name} = string.unpack(\">f\", {field_name}_bytes)\n")
-                elif ftype == "double":
-                    outfile.write(f"    local {field_name}_bytes = buffer(offset, dynamic_length):bytes():raw()\n")
-                    outfile.write(f"    local {field_name} = string.unpack(\">d\", {field_name}_bytes)\n")
-                else:
-                    outfile.write(f"    local {field_name} = buffer(offset, dynamic_length):string()\n")
-                outfile.write(f"    subtree:add(f_{field_name}, buffer(offset, dynamic_length))\n")
-                outfile.write(f"    field_values['{field_name}'] = {field_name}\n")
-                outfile.write("    offset = offset + dynamic_length\n\n")
-                
-                bitfields_count = info.get("bitfields_count")
-                if bitfields_count is not None and bitfields_count:
-                    outfile.write("    do\n")
-                    outfile.write(f"        local bits_per_field = (dynamic_length * 8) / {bitfields_count}\n")
-                    outfile.write(f"        for i = 0, {bitfields_count} - 1 do\n")
-                    outfile.write("            local shift = (({0} - 1 - i) * bits_per_field)\n".format(bitfields_count))
-                    outfile.write("            local mask = (1 << bits_per_field) - 1\n")
-                    outfile.write(f"            local bf_value = bit.band(bit.rshift({field_name}, shift), mask)\n")
-                    outfile.write(f"            subtree:add(bf_fields_{field_name}[i+1], bf_value)\n")
-                    outfile.write(f"            field_values['{field_name}_bf' .. i] = bf_value\n")
-                    outfile.write("        end\n")
-                    outfile.write("    end\n\n")
-        
-        # --- Added printing of packet details for each field ---
-        outfile.write("    -- Print packet details for each field (for debugging purposes)\n")
-        outfile.write("    print(\"Static Packet details:\")\n")
-        outfile.write("    for k, v in pairs(field_values) do\n")
-        outfile.write("        print(\"  \" .. k .. \" = \" .. tostring(v))\n")
-        outfile.write("    end\n\n")
-        # --- End printing packet details ---
-        
-        outfile.write("    local parts = {}\n")
-        outfile.write("    for k, v in pairs(field_values) do\n")
-        outfile.write("        table.insert(parts, k .. \"=\" .. tostring(v))\n")
-        outfile.write("    end\n")
-        outfile.write("    table.sort(parts)\n")
-        outfile.write("    pinfo.cols.info = \"Static: \" .. table.concat(parts, \", \")\n")
-        
-        outfile.write("end\n\n")
-        outfile.write("-- Register this dissector for the UDP port\n")
-        outfile.write("local udp_port = DissectorTable.get(\"udp.port\")\n")
-        outfile.write(f"udp_port:add({UDP_PORT}, {protocol})\n")
-    
-    print(f"Generated global static dissector: {static_filepath}")
+def emit_dissectors(ips, fields, protocol, output_dir, udp_port, debug=False):
+    # Render the schema once (only if some IP's file is out of date) and fill it
+    # in with a single format_map() per IP. Returns (written, unchanged) paths.
+    key = schema_key(fields)
+    written = []
+    unchanged = []
+    for ip in ips:
+        ip_clean = ip.replace('.', '_')
+        proto_name = f"{protocol}_{ip_clean}"
+        filename = f"{protocol}_for_{ip_clean}.lua"
+        filepath = os.path.join(output_dir, filename)
+
+        digest = content_hash("dissector", protocol, udp_port, debug, ip, key)
+        if is_up_to_date(filepath, digest):
+            unchanged.append(filepath)
+            continue
+        dissector_tmpl = dissector_template(key, protocol, udp_port, debug)
+        write_output(filepath, digest, dissector_tmpl.format_map({"ip": ip, "proto_name": proto_name}))
+        written.append(filepath)
+    return written, unchanged
+
+
+def main():
+    # Ensure output directory exists
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # Load the DPI specification
+    dpi_spec = load_dpi_spec(JSON_FILENAME)
+
+    protocol = dpi_spec.get("protocol", "CustomProtocol")
+    dpi_data = dpi_spec.get("dpi", {})
+
+    ##########################################################################
+    # 1. Generate per-IP Lua dissectors (with DPI tests)
+    ##########################################################################
+    schema_groups = defaultdict(list)
+    for ip, fields in dpi_data.items():
+        schema_groups[schema_key(fields)].append(ip)
+
+    # Each schema group writes its own files, so the groups are independent and
+    # can be rendered on separate cores. Small specs are not worth a pool.
+    emit = partial(emit_dissectors, protocol=protocol, output_dir=OUTPUT_DIR, udp_port=UDP_PORT, debug=DEBUG)
+    groups = list(schema_groups.values())
+    group_fields = [dpi_data[ips[0]] for ips in groups]
+    total_fields = sum(len(fields) for fields in group_fields)
+    if len(groups) > 1 and total_fields >= PARALLEL_MIN_FIELDS:
+        with ProcessPoolExecutor() as ex:
+            results = list(ex.map(emit, groups, group_fields))
+    else:
+        results = list(map(emit, groups, group_fields))
+
+    for written, unchanged in results:
+        for filepath in written:
+            print(f"Generated per-IP dissector: {filepath}")
+        for filepath in unchanged:
+            print(f"Unchanged per-IP dissector: {filepath}")
+
+    ##########################################################################
+    # 2. Generate a static general dissector for ALL IPs (no DPI tests)
+    ##########################################################################
+    if dpi_data:
+        first_ip = next(iter(dpi_data))
+        fields = intern_field_types(dpi_data[first_ip])
+        static_filename = f"{protocol}.lua"
+        static_filepath = os.path.join(OUTPUT_DIR, static_filename)
+
+        digest = content_hash("static", protocol, UDP_PORT, DEBUG, schema_key(fields))
+        ctx = {
+            "protocol": protocol,
+            "ip": None,
+            "proto_name": protocol,
+            "fields": fields,
+            "field_list": generate_field_list(fields),
+            "value_names": generate_value_names(fields),
+            "bounds_guards": bounds_guards(fields),
+            "layout": fixed_layout(fields),
+            "UDP_PORT": UDP_PORT,
+            "debug": DEBUG,
+        }
+        if is_up_to_date(static_filepath, digest):
+            print(f"Unchanged global static dissector: {static_filepath}")
+        else:
+            write_output(static_filepath, digest, STATIC_TEMPLATE.render(ctx))
+            print(f"Generated global static dissector: {static_filepath}")
+
+
+if __name__ == "__main__":
+    # "gen_diss2.py --to-pb OUT.pb" converts JSON_FILENAME to a binary DpiSpec
+    # instead of generating dissectors
+    if len(sys.argv) == 3 and sys.argv[1] == "--to-pb":
+        with open(sys.argv[2], "wb") as f:
+            f.write(dpi_spec_to_pb(load_dpi_spec(JSON_FILENAME)))
+    else:
+        main()